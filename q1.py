@@ -1,19 +1,41 @@
-import random
 import json
 import datetime
-import uuid
-from typing import Dict, List, Set, Optional
+import random
+import secrets
+from functools import reduce
+from operator import or_
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 class EventLogGenerator:
-    def __init__(self, process_description: Dict):
+    # Defaults for tasks without task details (including noise tasks)
+    DEFAULT_RESOURCES = ('system',)
+    DEFAULT_COST_RANGE = (10, 100)
+    NOISE_TASKS = ("System_Check", "Manual_Review", "Data_Update")
+
+    def __init__(self, process_description: Dict, seed: Optional[int] = None):
         """
         Initialize the event log generator with process description.
         
         Args:
             process_description: Dictionary containing process details
+            seed: Optional seed for the random number generators
         """
         self.process = process_description
         self.validate_process_description()
+        # NumPy draws the batched per-trace flags; scalar draws use random
+        self.rng = np.random.default_rng(seed)
+        self.random = random.Random(seed)
+        # Case ids are a per-run random prefix plus a running counter;
+        # with a seed the prefix is reproducible too
+        if seed is None:
+            self.run_prefix = secrets.token_hex(4)
+        else:
+            self.run_prefix = f"{self.random.getrandbits(32):08x}"
+        self.case_counter = 0
+        self.build_dependency_masks()
+        self.build_task_attributes()
         
     def validate_process_description(self):
         """Validate that the process description contains all required elements."""
@@ -21,110 +43,133 @@ class EventLogGenerator:
         if not all(key in self.process for key in required_keys):
             raise ValueError(f"Process description must contain: {required_keys}")
             
-    def generate_timestamp(self, previous_timestamp: Optional[datetime.datetime] = None) -> str:
+    def generate_timestamp(self, previous_timestamp: Optional[datetime.datetime] = None) -> datetime.datetime:
         """Generate a realistic timestamp for an event."""
         if previous_timestamp is None:
-            base = datetime.datetime.now()
-        else:
-            # Add random duration between 1 minute and 2 hours
-            base = previous_timestamp + datetime.timedelta(
-                minutes=random.randint(1, 120)
-            )
-        return base.strftime("%Y-%m-%d %H:%M:%S")
+            return datetime.datetime.now().replace(microsecond=0)
+        # Add random duration between 1 minute and 2 hours
+        return previous_timestamp + datetime.timedelta(
+            minutes=self.random.randint(1, 120)
+        )
         
-    def generate_event(self, task: str, case_id: str, timestamp: str) -> Dict:
+    def generate_event(self, task: str, case_id: str, timestamp: datetime.datetime) -> Dict:
         """Generate a single event with all required attributes."""
-        task_details = self.process['task_details'].get(task, {})
-        resources = task_details.get('resources', ['system'])
+        resources = self.task_resources.get(task, self.DEFAULT_RESOURCES)
+        min_cost, max_cost = self.task_cost_ranges.get(task, self.DEFAULT_COST_RANGE)
         
         return {
             'case_id': case_id,
             'task': task,
-            'timestamp': timestamp,
-            'resource': random.choice(resources),
+            'timestamp': timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+            'resource': self.random.choice(resources),
             'lifecycle': 'complete',
-            'cost': round(random.uniform(
-                task_details.get('min_cost', 10),
-                task_details.get('max_cost', 100)
-            ), 2)
+            'cost': round(self.random.uniform(min_cost, max_cost), 2)
         }
 
-    def generate_noise_event(self, case_id: str, timestamp: str) -> Dict:
+    def generate_noise_event(self, case_id: str, timestamp: datetime.datetime) -> Dict:
         """Generate a noise event that doesn't belong to the actual process."""
-        noise_tasks = [
-            f"System_Check_{random.randint(1,100)}",
-            f"Manual_Review_{random.randint(1,100)}",
-            f"Data_Update_{random.randint(1,100)}"
+        noise_task = self.random.choice(self.NOISE_TASKS)
+        noise_id = self.random.randint(1, 100)
+        return self.generate_event(f"{noise_task}_{noise_id}", case_id, timestamp)
+
+    def build_task_attributes(self):
+        """Resolve each task's resources and cost range once."""
+        self.task_resources = {}
+        self.task_cost_ranges = {}
+        for task, details in self.process['task_details'].items():
+            self.task_resources[task] = tuple(
+                details.get('resources', self.DEFAULT_RESOURCES)
+            )
+            self.task_cost_ranges[task] = (
+                details.get('min_cost', self.DEFAULT_COST_RANGE[0]),
+                details.get('max_cost', self.DEFAULT_COST_RANGE[1])
+            )
+
+    def build_dependency_masks(self):
+        """Encode task dependencies as bitmasks and concurrency as a set of task ids."""
+        tasks = self.process['tasks']
+        self.task_ids = {task: i for i, task in enumerate(tasks)}
+        self.all_tasks_mask = (1 << len(tasks)) - 1
+        # Dependencies on unknown tasks map to a bit that is never completed
+        unknown_bit = 1 << len(tasks)
+        self.dependency_masks = [
+            reduce(or_, (
+                1 << self.task_ids[dep] if dep in self.task_ids else unknown_bit
+                for dep in self.process['dependencies'].get(task, [])
+            ), 0)
+            for task in tasks
+        ]
+        self.concurrent_task_ids = frozenset(
+            self.task_ids[task] for task in self.process.get('concurrency', [])
+            if task in self.task_ids
+        )
+
+    def get_available_tasks(self, completed_mask: int) -> List[int]:
+        """Get ids of tasks whose dependencies have been satisfied."""
+        return [
+            i for i, dependency_mask in enumerate(self.dependency_masks)
+            if not (completed_mask >> i) & 1
+            and not dependency_mask & ~completed_mask
         ]
-        return self.generate_event(random.choice(noise_tasks), case_id, timestamp)
-
-    def get_available_tasks(self, completed_tasks: Set[str]) -> List[str]:
-        """Get tasks whose dependencies have been satisfied."""
-        available = []
-        for task in self.process['tasks']:
-            if task not in completed_tasks:
-                dependencies = self.process['dependencies'].get(task, [])
-                if all(dep in completed_tasks for dep in dependencies):
-                    available.append(task)
-        return available
 
     def generate_trace(self, 
                       use_uncommon_path: bool,
                       noise_level: float,
                       missing_event_prob: float) -> List[Dict]:
         """Generate a single trace (sequence of events)."""
-        case_id = str(uuid.uuid4())
+        self.case_counter += 1
+        case_id = f"{self.run_prefix}-{self.case_counter:08d}"
         trace = []
         timestamp = None
-        completed_tasks = set()
 
         # Choose between normal and uncommon path
         if use_uncommon_path and 'uncommon_paths' in self.process:
-            path = random.choice(self.process['uncommon_paths'])
+            uncommon_paths = self.process['uncommon_paths']
+            path = self.random.choice(uncommon_paths)
         else:
             # Generate normal path considering dependencies and concurrency
+            tasks = self.process['tasks']
+            concurrent_task_ids = self.concurrent_task_ids
             path = []
-            while len(completed_tasks) < len(self.process['tasks']):
-                available = self.get_available_tasks(completed_tasks)
+            completed_mask = 0
+            while completed_mask != self.all_tasks_mask:
+                available = self.get_available_tasks(completed_mask)
                 if not available:
                     break
                     
                 # Handle concurrent tasks
-                concurrent_tasks = [t for t in available 
-                                 if t in self.process.get('concurrency', [])]
-                if concurrent_tasks:
-                    task = random.choice(concurrent_tasks)
-                else:
-                    task = random.choice(available)
+                concurrent_tasks = [i for i in available if i in concurrent_task_ids]
+                task_id = self.random.choice(concurrent_tasks or available)
                     
-                path.append(task)
-                completed_tasks.add(task)
+                path.append(tasks[task_id])
+                completed_mask |= 1 << task_id
 
-        # Generate events for the path
-        for task in path:
-            # Check for missing events
-            if random.random() < missing_event_prob:
+        # Generate events for the path, sampling all missing events up front
+        missing = self.rng.random(len(path)) < missing_event_prob
+        for task, is_missing in zip(path, missing):
+            if is_missing:
                 continue
                 
-            timestamp = self.generate_timestamp(
-                previous_timestamp=timestamp and datetime.datetime.strptime(
-                    timestamp, "%Y-%m-%d %H:%M:%S"
-                )
-            )
+            timestamp = self.generate_timestamp(previous_timestamp=timestamp)
             trace.append(self.generate_event(task, case_id, timestamp))
 
         # Add noise events
         if noise_level > 0:
             num_noise = int(len(trace) * noise_level)
-            for _ in range(num_noise):
-                timestamp = self.generate_timestamp(
-                    previous_timestamp=timestamp and datetime.datetime.strptime(
-                        timestamp, "%Y-%m-%d %H:%M:%S"
-                    )
+            if num_noise:
+                insert_positions = np.sort(
+                    self.rng.integers(0, len(trace) + 1, size=num_noise)
                 )
-                noise_event = self.generate_noise_event(case_id, timestamp)
-                insert_pos = random.randint(0, len(trace))
-                trace.insert(insert_pos, noise_event)
+                # Merge the noise events into the trace in a single pass
+                noisy_trace = []
+                start = 0
+                for insert_pos in insert_positions:
+                    timestamp = self.generate_timestamp(previous_timestamp=timestamp)
+                    noisy_trace.extend(trace[start:insert_pos])
+                    noisy_trace.append(self.generate_noise_event(case_id, timestamp))
+                    start = insert_pos
+                noisy_trace.extend(trace[start:])
+                trace = noisy_trace
 
         return trace
 
@@ -134,18 +179,62 @@ class EventLogGenerator:
                     uncommon_path_freq: float = 0.2,
                     missing_event_prob: float = 0.1) -> List[List[Dict]]:
         """Generate complete event log with specified parameters."""
-        event_log = []
+        return list(self.iter_log(
+            num_traces,
+            noise_level,
+            uncommon_path_freq,
+            missing_event_prob
+        ))
+
+    def iter_log(self,
+                 num_traces: int,
+                 noise_level: float = 0.1,
+                 uncommon_path_freq: float = 0.2,
+                 missing_event_prob: float = 0.1) -> Iterator[List[Dict]]:
+        """Yield the traces of an event log one at a time."""
+        uncommon_mask = self.rng.random(num_traces) < uncommon_path_freq
         
-        for _ in range(num_traces):
-            use_uncommon_path = random.random() < uncommon_path_freq
-            trace = self.generate_trace(
-                use_uncommon_path,
+        for use_uncommon_path in uncommon_mask:
+            yield self.generate_trace(
+                bool(use_uncommon_path),
                 noise_level,
                 missing_event_prob
             )
-            event_log.append(trace)
-            
-        return event_log
+
+    def generate_log_to_file(self,
+                             path: str,
+                             num_traces: int,
+                             noise_level: float = 0.1,
+                             uncommon_path_freq: float = 0.2,
+                             missing_event_prob: float = 0.1) -> Tuple[int, Optional[List[Dict]]]:
+        """
+        Generate an event log and stream it to a JSON file trace by trace.
+        
+        Only one trace is held in memory at a time; the file is a JSON array
+        with one trace per line.
+        
+        Returns:
+            Tuple of (number of traces written, first trace or None)
+        """
+        num_written = 0
+        first_trace = None
+        with open(path, "w") as f:
+            f.write("[")
+            for trace in self.iter_log(
+                num_traces,
+                noise_level,
+                uncommon_path_freq,
+                missing_event_prob
+            ):
+                if num_written:
+                    f.write(",\n")
+                else:
+                    f.write("\n")
+                    first_trace = trace
+                f.write(json.dumps(trace))
+                num_written += 1
+            f.write("\n]\n")
+        return num_written, first_trace
 
 # Sample process description
 sample_process = {
@@ -201,22 +290,20 @@ if __name__ == "__main__":
     # Initialize generator
     generator = EventLogGenerator(sample_process)
     
-    # Generate log with parameters
-    event_log = generator.generate_log(
+    # Generate log with parameters and stream it to a JSON file
+    output_file = "event_log.json"
+    num_traces, sample_trace = generator.generate_log_to_file(
+        output_file,
         num_traces=50,
         noise_level=0.1,  # 10% noise events
         uncommon_path_freq=0.2,  # 20% uncommon paths
         missing_event_prob=0.1  # 10% chance of missing events
     )
     
-    # Save to JSON file
-    output_file = "event_log.json"
-    with open(output_file, "w") as f:
-        json.dump(event_log, f, indent=2)
-    
-    print(f"Generated {len(event_log)} traces and saved to '{output_file}'")
+    print(f"Generated {num_traces} traces and saved to '{output_file}'")
     
     # Print sample trace for verification
-    print("\nSample trace:")
-    for event in event_log[0]:
-        print(f"Task: {event['task']}, Time: {event['timestamp']}, Resource: {event['resource']}")
\ No newline at end of file
+    if sample_trace is not None:
+        print("\nSample trace:")
+        for event in sample_trace:
+            print(f"Task: {event['task']}, Time: {event['timestamp']}, Resource: {event['resource']}")
\ No newline at end of file
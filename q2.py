@@ -1,11 +1,35 @@
 import json
-from collections import Counter, defaultdict
+import sys
+from collections import Counter
+import numpy as np
 import pandas as pd
 from tabulate import tabulate
 from typing import Dict, Set, List, Tuple, Any
 import logging
 from datetime import datetime
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; the stdlib parser also accepts bytes
+    from json import loads as json_loads
+
+# Joins the events of a trace into a single hashable key
+TRACE_SEPARATOR = "\x1f"
+
+# Footprint relation codes and their display labels
+NO_RELATION, CAUSAL, REVERSE_CAUSAL, PARALLEL = range(4)
+FOOTPRINT_LABELS = np.array(["#", "->", "<-", "||"])
+
+
+def fill_follows(follows: np.ndarray, events: np.ndarray, offsets: np.ndarray) -> None:
+    """Mark every directly-follows pair of the concatenated traces using NumPy indexing."""
+    within_trace = np.ones(max(len(events) - 1, 0), dtype=bool)
+    # The pair ending at a trace start crosses a trace boundary
+    starts = offsets[1:-1]
+    within_trace[starts[(starts > 0) & (starts < len(events))] - 1] = False
+    follows[events[:-1][within_trace], events[1:][within_trace]] = True
+
+
 class AlphaAlgorithm:
     """
     Implementation of the Alpha Algorithm for process mining.
@@ -16,41 +40,75 @@ class AlphaAlgorithm:
         """Initialize the Alpha Algorithm with an event log file path."""
         self.log_path = log_path
         self.event_log = None
+        self._log_scan = None
         self.unique_traces = None
         self.trace_frequencies = None
         self.unique_events = None
+        self.sorted_events = None
         self.initial_events = None
         self.final_events = None
         self.footprint_matrix = None
+        self.footprint_events = None
+        self.footprint_codes = None
+        self.causal_pairs = None
+        self.parallel_pairs = None
         
-        # Setup logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
         self.logger = logging.getLogger(__name__)
         
     def load_event_log(self) -> None:
         """Load and validate the event log from the specified file."""
         try:
-            with open(self.log_path, "r") as f:
-                self.event_log = json.load(f)
+            with open(self.log_path, "rb") as f:
+                self.event_log = json_loads(f.read())
                 
             if not isinstance(self.event_log, list) or not self.event_log:
                 raise ValueError("Event log must be a non-empty list of traces")
                 
-            # Extract just the task names from the event dictionaries
+            # Extract just the (interned) task names from the event dictionaries
             self.event_log = [
-                [event['task'] for event in trace]
+                [sys.intern(event['task']) for event in trace]
                 for trace in self.event_log
                 if trace  # Skip empty traces
             ]
+            self._log_scan = None
             
-            self.logger.info(f"Successfully loaded {len(self.event_log)} traces")
+            self.logger.info("Successfully loaded %d traces", len(self.event_log))
         except Exception as e:
-            self.logger.error(f"Error loading event log: {str(e)}")
+            self.logger.error("Error loading event log: %s", e)
             raise
 
+    def _scan_log(self) -> Tuple[Counter, Set[str], Set[str], Set[str]]:
+        """
+        Count traces and collect the event sets in a single pass over the log.
+        
+        The event sets only change on the first occurrence of a trace, so
+        repeated traces cost one dictionary update each. The result is
+        cached until the log is reloaded.
+        
+        Returns:
+            Tuple of (trace_frequencies, unique_events, initial_events, final_events)
+        """
+        if self._log_scan is None:
+            trace_frequencies = Counter()
+            unique_events = set()
+            initial_events = set()
+            final_events = set()
+            
+            for trace in self.event_log:
+                trace_key = TRACE_SEPARATOR.join(trace)
+                if trace_key in trace_frequencies:
+                    trace_frequencies[trace_key] += 1
+                    continue
+                
+                trace_frequencies[trace_key] = 1
+                if trace:  # Skip empty traces
+                    unique_events.update(trace)
+                    initial_events.add(trace[0])
+                    final_events.add(trace[-1])
+            
+            self._log_scan = (trace_frequencies, unique_events, initial_events, final_events)
+        return self._log_scan
+
     def extract_unique_traces(self) -> pd.DataFrame:
         """
         Extract unique traces and their frequencies from the event log.
@@ -59,30 +117,27 @@ class AlphaAlgorithm:
             DataFrame containing unique traces and their frequencies
         """
         try:
-            # Convert traces to tuples for counting
-            traces = [tuple(trace) for trace in self.event_log]
-            self.trace_frequencies = Counter(traces)
+            # Traces are counted by a single joined string key per trace
+            self.trace_frequencies = self._scan_log()[0]
             
-            # Create DataFrame for display
-            df = pd.DataFrame(columns=["Trace", "Frequency", "Percentage"])
+            # Create DataFrame for display in one go, already sorted by frequency
             total_traces = len(self.event_log)
+            items = self.trace_frequencies.most_common()
+            frequencies = np.fromiter((freq for _, freq in items), dtype=np.int64, count=len(items))
+            percentages = frequencies / total_traces * 100
             
-            for trace, freq in self.trace_frequencies.items():
-                percentage = (freq / total_traces) * 100
-                df = pd.concat([df, pd.DataFrame({
-                    "Trace": [" -> ".join(trace)],
-                    "Frequency": [freq],
-                    "Percentage": [f"{percentage:.2f}%"]
-                })], ignore_index=True)
-            
-            df = df.sort_values("Frequency", ascending=False)
+            df = pd.DataFrame({
+                "Trace": [trace_key.replace(TRACE_SEPARATOR, " -> ") for trace_key, _ in items],
+                "Frequency": frequencies,
+                "Percentage": pd.Series(percentages).map("{:.2f}%".format)
+            })
             self.unique_traces = df
             
-            self.logger.info(f"Found {len(df)} unique traces")
+            self.logger.info("Found %d unique traces", len(df))
             return df
             
         except Exception as e:
-            self.logger.error(f"Error extracting unique traces: {str(e)}")
+            self.logger.error("Error extracting unique traces: %s", e)
             raise
 
     def extract_event_sets(self) -> Tuple[Set[str], Set[str], Set[str]]:
@@ -93,64 +148,82 @@ class AlphaAlgorithm:
             Tuple of (unique_events, initial_events, final_events)
         """
         try:
-            self.unique_events = set()
-            self.initial_events = set()
-            self.final_events = set()
-            
-            for trace in self.event_log:
-                if trace:  # Skip empty traces
-                    self.unique_events.update(trace)
-                    self.initial_events.add(trace[0])
-                    self.final_events.add(trace[-1])
+            _, unique, initial, final = self._scan_log()
+            self.unique_events = set(unique)
+            self.initial_events = set(initial)
+            self.final_events = set(final)
+            # Sorted once here and reused by the footprint, Petri net and output
+            self.sorted_events = sorted(self.unique_events)
             
             self.logger.info(
-                f"Extracted {len(self.unique_events)} unique events, "
-                f"{len(self.initial_events)} initial events, "
-                f"{len(self.final_events)} final events"
+                "Extracted %d unique events, %d initial events, %d final events",
+                len(self.unique_events),
+                len(self.initial_events),
+                len(self.final_events)
             )
             
             return self.unique_events, self.initial_events, self.final_events
             
         except Exception as e:
-            self.logger.error(f"Error extracting event sets: {str(e)}")
+            self.logger.error("Error extracting event sets: %s", e)
             raise
 
-    def build_footprint_matrix(self) -> pd.DataFrame:
+    def build_footprint_matrix(self) -> Tuple[Set[Tuple[str, str]], Set[Tuple[str, str]]]:
         """
-        Construct the footprint matrix showing relationships between events.
+        Derive the footprint relations from a boolean directly-follows matrix.
+        
+        The footprint is kept as an int8 matrix of relation codes; labels
+        are only attached when it is displayed.
         
         Returns:
-            DataFrame containing the footprint matrix
+            Tuple of (causal_pairs, parallel_pairs)
         """
         try:
-            # Build direct follow relationships
-            follows = defaultdict(set)
-            for trace in self.event_log:
-                for i in range(len(trace) - 1):
-                    follows[trace[i]].add(trace[i + 1])
+            # Build direct follow relationships over the int-encoded log
+            events = self.sorted_events
+            index = {event: i for i, event in enumerate(events)}
+            encoded = np.fromiter(
+                (index[event] for trace in self.event_log for event in trace),
+                dtype=np.intp
+            )
+            offsets = np.cumsum([0] + [len(trace) for trace in self.event_log])
+            follows = np.zeros((len(events), len(events)), dtype=bool)
+            fill_follows(follows, encoded, offsets)
             
-            # Construct footprint matrix
-            matrix_data = {}
-            for a in sorted(self.unique_events):
-                matrix_data[a] = {}
-                for b in sorted(self.unique_events):
-                    if b in follows[a] and a in follows[b]:
-                        matrix_data[a][b] = "||"  # Parallel
-                    elif b in follows[a]:
-                        matrix_data[a][b] = "->"   # Causality
-                    elif a in follows[b]:
-                        matrix_data[a][b] = "<-"   # Reverse causality
-                    else:
-                        matrix_data[a][b] = "#"   # No relation
+            # Classify all pairs at once: bit 0 is a > b, bit 1 is b > a
+            codes = follows.astype(np.int8) | (follows.T.astype(np.int8) << 1)
+            self.footprint_events = events
+            self.footprint_codes = codes
             
-            self.footprint_matrix = pd.DataFrame(matrix_data)
+            self.causal_pairs = {
+                (events[a], events[b]) for a, b in np.argwhere(codes == CAUSAL)
+            }
+            self.parallel_pairs = {
+                (events[a], events[b]) for a, b in np.argwhere(codes == PARALLEL)
+            }
+            self.footprint_matrix = None
             self.logger.info("Successfully built footprint matrix")
-            return self.footprint_matrix
+            return self.causal_pairs, self.parallel_pairs
             
         except Exception as e:
-            self.logger.error(f"Error building footprint matrix: {str(e)}")
+            self.logger.error("Error building footprint matrix: %s", e)
             raise
 
+    def display_footprint_matrix(self) -> pd.DataFrame:
+        """
+        Materialize the dense footprint matrix as a labelled DataFrame.
+        
+        Returns:
+            DataFrame whose cell (a, b) holds the relation between a and b
+        """
+        if self.footprint_matrix is None:
+            self.footprint_matrix = pd.DataFrame(
+                FOOTPRINT_LABELS[self.footprint_codes],
+                index=self.footprint_events,
+                columns=self.footprint_events
+            )
+        return self.footprint_matrix
+
     def extract_relationships(self) -> Dict[str, Set[Tuple[str, str]]]:
         """
         Extract causal relationships (XL), maximal pairs (YL), place set (PL), and flow relation (FL).
@@ -159,40 +232,21 @@ class AlphaAlgorithm:
             Dictionary containing all relationship sets
         """
         try:
+            # Causal (XL) and maximal (YL) pairs come straight from the footprint
+            causal = self.causal_pairs
             relationships = {
-                "causal": set(),
-                "maximal": set(),
-                "places": set(),
-                "flow": set()
+                "causal": set(causal),
+                "maximal": set(self.parallel_pairs),
+                "places": set(causal),  # Place set (PL)
+                "flow": causal | {(b, a) for a, b in causal}  # Flow relation (FL)
             }
             
-            # Extract causal relationships (XL)
-            for a in self.unique_events:
-                for b in self.unique_events:
-                    if self.footprint_matrix.loc[a, b] == "->":
-                        relationships["causal"].add((a, b))
-            
-            # Extract maximal pairs (YL)
-            for a in self.unique_events:
-                for b in self.unique_events:
-                    if self.footprint_matrix.loc[a, b] == "||":
-                        relationships["maximal"].add((a, b))
-            
-            # Build place set (PL)
-            for a, b in relationships["causal"]:
-                relationships["places"].add((a, b))
-            
-            # Build flow relation (FL)
-            relationships["flow"] = relationships["causal"].union(
-                {(b, a) for a, b in relationships["causal"]}
-            )
-            
             self.relationships = relationships
             self.logger.info("Successfully extracted all relationships")
             return relationships
             
         except Exception as e:
-            self.logger.error(f"Error extracting relationships: {str(e)}")
+            self.logger.error("Error extracting relationships: %s", e)
             raise
 
     def build_petri_net(self) -> Dict[str, Any]:
@@ -204,11 +258,11 @@ class AlphaAlgorithm:
         """
         try:
             petri_net = {
-                "places": sorted(list(self.relationships["places"])),
-                "transitions": sorted(list(self.unique_events)),
-                "initial_marking": sorted(list(self.initial_events)),
-                "final_marking": sorted(list(self.final_events)),
-                "flow_relation": sorted(list(self.relationships["flow"]))
+                "places": sorted(self.relationships["places"]),
+                "transitions": list(self.sorted_events),
+                "initial_marking": sorted(self.initial_events),
+                "final_marking": sorted(self.final_events),
+                "flow_relation": sorted(self.relationships["flow"])
             }
             
             self.petri_net = petri_net
@@ -216,7 +270,7 @@ class AlphaAlgorithm:
             return petri_net
             
         except Exception as e:
-            self.logger.error(f"Error building Petri net: {str(e)}")
+            self.logger.error("Error building Petri net: %s", e)
             raise
 
     def save_results(self, output_dir: str = "./") -> None:
@@ -230,7 +284,7 @@ class AlphaAlgorithm:
             )
             
             # Save footprint matrix
-            self.footprint_matrix.to_csv(
+            self.display_footprint_matrix().to_csv(
                 f"{output_dir}footprint_matrix_{timestamp}.csv"
             )
             
@@ -238,10 +292,10 @@ class AlphaAlgorithm:
             with open(f"{output_dir}petri_net_{timestamp}.json", "w") as f:
                 json.dump(self.petri_net, f, indent=4)
             
-            self.logger.info(f"All results saved to {output_dir}")
+            self.logger.info("All results saved to %s", output_dir)
             
         except Exception as e:
-            self.logger.error(f"Error saving results: {str(e)}")
+            self.logger.error("Error saving results: %s", e)
             raise
 
     def run_analysis(self) -> None:
@@ -253,14 +307,20 @@ class AlphaAlgorithm:
         print(tabulate(df_traces, headers='keys', tablefmt='psql'))
         
         print("\n=== Event Sets ===")
-        unique, initial, final = self.extract_event_sets()
-        print(f"Unique Events (TL): {sorted(unique)}")
+        _, initial, final = self.extract_event_sets()
+        print(f"Unique Events (TL): {self.sorted_events}")
         print(f"Initial Events (TI): {sorted(initial)}")
         print(f"Final Events (TO): {sorted(final)}")
         
         print("\n=== Footprint Matrix ===")
-        matrix = self.build_footprint_matrix()
-        print(tabulate(matrix, headers='keys', tablefmt='psql'))
+        self.build_footprint_matrix()
+        # Print straight from the code matrix; the DataFrame is only built to save
+        print(tabulate(
+            FOOTPRINT_LABELS[self.footprint_codes],
+            headers=self.footprint_events,
+            showindex=self.footprint_events,
+            tablefmt='psql'
+        ))
         
         print("\n=== Relationships ===")
         relationships = self.extract_relationships()
@@ -275,6 +335,12 @@ class AlphaAlgorithm:
         self.save_results()
 
 if __name__ == "__main__":
+    # Setup logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    
     # Initialize and run the Alpha Algorithm
     alpha = AlphaAlgorithm("event_log.json")
     alpha.run_analysis()
\ No newline at end of file
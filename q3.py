@@ -1,66 +1,75 @@
-import json
 import os
+import subprocess
 from graphviz import Digraph
 from typing import Dict, Any
-import glob
 from datetime import datetime
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; the stdlib parser also accepts bytes
+    from json import loads as json_loads
+
 class PetriNetVisualizer:
     """
     Visualizes Petri nets using Graphviz with enhanced visual features
     and automatic latest file detection.
     """
+
+    # Attributes shared by every node, set once per graph. The style
+    # tables never change, so they are built once for the class.
+    NODE_DEFAULTS = {
+        'style': 'filled',
+        'height': '0.6',
+        'width': '0.6',
+        'fontname': 'Arial'
+    }
+    # Per-class attributes on top of the node defaults
+    STYLES = {
+        'transition': {
+            'shape': 'rectangle',
+            'fillcolor': 'lightgreen',
+            'width': '1.2'
+        },
+        'place': {
+            'shape': 'circle',
+            'fillcolor': 'lightblue'
+        },
+        'initial_place': {
+            'shape': 'circle',
+            'fillcolor': 'lightgray',
+            'peripheries': '2'
+        },
+        'final_place': {
+            'shape': 'circle',
+            'fillcolor': 'lightpink',
+            'peripheries': '2'
+        }
+    }
     
     def __init__(self):
         """Initialize the PetriNet visualizer with default styles."""
-        self.styles = {
-            'transition': {
-                'shape': 'rectangle',
-                'style': 'filled',
-                'fillcolor': 'lightgreen',
-                'height': '0.6',
-                'width': '1.2',
-                'fontname': 'Arial'
-            },
-            'place': {
-                'shape': 'circle',
-                'style': 'filled',
-                'fillcolor': 'lightblue',
-                'height': '0.6',
-                'width': '0.6',
-                'fontname': 'Arial'
-            },
-            'initial_place': {
-                'shape': 'circle',
-                'style': 'filled',
-                'fillcolor': 'lightgray',
-                'height': '0.6',
-                'width': '0.6',
-                'peripheries': '2',
-                'fontname': 'Arial'
-            },
-            'final_place': {
-                'shape': 'circle',
-                'style': 'filled',
-                'fillcolor': 'lightpink',
-                'height': '0.6',
-                'width': '0.6',
-                'peripheries': '2',
-                'fontname': 'Arial'
-            }
-        }
+        self.node_defaults = self.NODE_DEFAULTS
+        self.styles = self.STYLES
         
     def find_latest_petri_net(self, directory: str = "./") -> str:
         """Find the most recent Petri net file in the specified directory."""
-        # Look for both .txt and .json files
-        files = glob.glob(os.path.join(directory, "petri_net_*.json"))
-        files.extend(glob.glob(os.path.join(directory, "petri_net.txt")))
+        # Look for both .txt and .json files, keeping the most recent one
+        # in a single pass that stats each candidate once
+        latest_file = None
+        latest_mtime = None
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if not (name == "petri_net.txt"
+                        or (name.startswith("petri_net_") and name.endswith(".json"))):
+                    continue
+                mtime = entry.stat().st_mtime
+                if latest_mtime is None or mtime > latest_mtime:
+                    latest_file, latest_mtime = entry.path, mtime
         
-        if not files:
+        if latest_file is None:
             raise FileNotFoundError("No Petri net files found in the specified directory")
             
-        # Get the most recent file
-        latest_file = max(files, key=os.path.getmtime)
         print(f"Using latest Petri net file: {latest_file}")
         return latest_file
 
@@ -70,8 +79,8 @@ class PetriNetVisualizer:
             if file_path is None:
                 file_path = self.find_latest_petri_net()
                 
-            with open(file_path, "r") as f:
-                petri_net = json.load(f)
+            with open(file_path, "rb") as f:
+                petri_net = json_loads(f.read())
                 
             # Convert keys to lowercase for consistency
             return {k.lower(): v for k, v in petri_net.items()}
@@ -83,7 +92,7 @@ class PetriNetVisualizer:
         """Create a Graphviz visualization of the Petri net."""
         dot = Digraph(comment='Petri Net Visualization')
         dot.attr(rankdir='LR')  # Left to Right layout
-        dot.attr('node', fontsize='12')
+        dot.attr('node', fontsize='12', **self.node_defaults)
         dot.attr('edge', fontsize='10')
         
         # Add initial place
@@ -92,31 +101,46 @@ class PetriNetVisualizer:
         # Add final place
         dot.node('end', '', **self.styles['final_place'])
         
-        # Add transitions
-        for t in petri_net['transitions']:
-            dot.node(f"T_{t}", t, **self.styles['transition'])
+        # Add transitions, formatting each node id once; repeated labels
+        # collapse into a single node. The style is set once for the
+        # whole group instead of on every node.
+        t_ids = {t: f"T_{t}" for t in dict.fromkeys(petri_net['transitions'])}
+        with dot.subgraph() as transitions:
+            transitions.attr('node', **self.styles['transition'])
+            for t, t_id in t_ids.items():
+                transitions.node(t_id, t)
             
+        # Resolve source, place and target ids once per flow relation
+        arcs = [
+            (
+                t_ids.get(source) or f"T_{source}",
+                f"P_{source}_{target}",
+                t_ids.get(target) or f"T_{target}"
+            )
+            for source, target in petri_net['flow_relation']
+        ]
+        
         # Add places for each flow relation
         seen_places = set()
-        for source, target in petri_net['flow_relation']:
-            place_id = f"P_{source}_{target}"
-            if place_id not in seen_places:
-                dot.node(place_id, '', **self.styles['place'])
-                seen_places.add(place_id)
+        with dot.subgraph() as places:
+            places.attr('node', **self.styles['place'])
+            for _, place_id, _ in arcs:
+                if place_id not in seen_places:
+                    places.node(place_id, '')
+                    seen_places.add(place_id)
         
         # Add edges for initial transitions
         for t in petri_net['initial_marking']:
-            dot.edge('start', f"T_{t}")
+            dot.edge('start', t_ids.get(t) or f"T_{t}")
             
         # Add edges for final transitions
         for t in petri_net['final_marking']:
-            dot.edge(f"T_{t}", 'end')
+            dot.edge(t_ids.get(t) or f"T_{t}", 'end')
             
         # Add edges for flow relations
-        for source, target in petri_net['flow_relation']:
-            place_id = f"P_{source}_{target}"
-            dot.edge(f"T_{source}", place_id)
-            dot.edge(place_id, f"T_{target}")
+        for source_id, place_id, target_id in arcs:
+            dot.edge(source_id, place_id)
+            dot.edge(place_id, target_id)
             
         return dot
 
@@ -124,6 +148,7 @@ class PetriNetVisualizer:
         """Create a legend subgraph explaining the symbols."""
         legend = Digraph('cluster_legend')
         legend.attr(label='Legend', labeljust='l')
+        legend.attr('node', **self.node_defaults)
         
         # Add legend items
         legend.node('L_trans', 'Activity', **self.styles['transition'])
@@ -159,20 +184,26 @@ class PetriNetVisualizer:
             
             with combined.subgraph(name='cluster_main') as main:
                 main.attr(label='Process Model')
-                for line in main_graph.body:
-                    main.body.append(line)
+                main.body.extend(main_graph.body)
                     
             with combined.subgraph(name='cluster_legend') as leg:
-                for line in legend.body:
-                    leg.body.append(line)
+                leg.body.extend(legend.body)
             
             # Save with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_filename = f"{output_path}_{timestamp}"
             
-            # Render in multiple formats
-            combined.render(output_filename, format='png', cleanup=True)
-            combined.render(output_filename, format='pdf', cleanup=True)
+            # Render in multiple formats from a single layout run, piping
+            # the source to dot instead of writing it to disk first
+            subprocess.run(
+                [
+                    combined.engine,
+                    "-Tpng", "-o", f"{output_filename}.png",
+                    "-Tpdf", "-o", f"{output_filename}.pdf"
+                ],
+                input=combined.source.encode(combined.encoding),
+                check=True
+            )
             
             print(f"Visualization saved as '{output_filename}.png' and '{output_filename}.pdf'")
             
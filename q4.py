@@ -1,15 +1,31 @@
 import os
-import json
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
 import random
+from operator import itemgetter
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; the stdlib parser also accepts bytes
+    from json import loads as json_loads
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; fall back to loading the whole log
+    ijson = None
+
+# ijson events carrying a scalar value
+SCALAR_EVENTS = frozenset(("null", "boolean", "integer", "double", "number", "string"))
 
 
 def load_event_log(file_path):
     """
     Load the event log from a JSON file.
     """
-    with open(file_path, "r") as f:
-        return json.load(f)
+    with open(file_path, "rb") as f:
+        return json_loads(f.read())
 
 
 def preprocess_event_log(raw_event_log):
@@ -22,11 +38,47 @@ def preprocess_event_log(raw_event_log):
     Returns:
     - List of traces, where each trace is a list of task names.
     """
-    processed_event_log = []
-    for trace in raw_event_log:
-        processed_trace = [event["task"] for event in trace]  # Extract 'task' field
-        processed_event_log.append(processed_trace)
-    return processed_event_log
+    get_task = itemgetter("task")  # Extract 'task' field
+    return [list(map(get_task, trace)) for trace in raw_event_log]
+
+
+def load_task_traces(file_path):
+    """
+    Load the event log as traces of task names.
+
+    With ijson the file is streamed and only the "task" values are kept, so the
+    per-event dictionaries are never built. Without it the whole log is loaded
+    and passed through preprocess_event_log.
+
+    Args:
+    - file_path (str): Path to the JSON event log.
+
+    Returns:
+    - List of traces, where each trace is a list of task names.
+    """
+    if ijson is None:
+        return preprocess_event_log(load_event_log(file_path))
+
+    traces = []
+    with open(file_path, "rb") as f:
+        # Floats are parsed as float, not Decimal, to match the json fallback
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if prefix == "item.item.task" and event in SCALAR_EVENTS:
+                trace.append(value)
+            elif prefix == "item.item":
+                if event == "start_map":
+                    has_task = False
+                elif event == "map_key" and value == "task":
+                    has_task = True
+                elif event == "end_map" and not has_task:
+                    # Fail on events without a task, as itemgetter does
+                    raise KeyError("task")
+            elif prefix == "item":
+                if event == "start_array":
+                    trace = []
+                elif event == "end_array":
+                    traces.append(trace)
+    return traces
 
 
 def fetch_latest_petri_net(directory="."):
@@ -39,60 +91,189 @@ def fetch_latest_petri_net(directory="."):
     Returns:
     - dict: Parsed JSON content of the latest Petri net file.
     """
-    petri_net_files = [f for f in os.listdir(directory) if f.startswith("petri_net") and f.endswith(".json")]
-    if not petri_net_files:
+    # Pick the most recently modified file in a single directory scan
+    latest_entry = None
+    latest_mtime = None
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith("petri_net") and entry.name.endswith(".json"):
+                mtime = entry.stat().st_mtime
+                if latest_mtime is None or mtime > latest_mtime:
+                    latest_entry, latest_mtime = entry, mtime
+    if latest_entry is None:
         raise FileNotFoundError("No Petri net JSON files found in the directory.")
     
-    # Sort files by timestamp in the filename
-    latest_file = max(petri_net_files, key=lambda f: os.path.getmtime(os.path.join(directory, f)))
-    print(f"Using latest Petri net file: {latest_file}")
+    print(f"Using latest Petri net file: {latest_entry.name}")
     
     # Load the latest Petri net JSON
-    with open(os.path.join(directory, latest_file), "r") as f:
-        petri_net = json.load(f)
+    with open(latest_entry.path, "rb") as f:
+        petri_net = json_loads(f.read())
     return petri_net
 
 
-def calculate_fitness(petri_net, traces):
+EMPTY_MARKING = frozenset()
+
+
+def get_successors(petri_net):
+    """
+    Map each transition to the frozenset of transitions that directly follow it.
+
+    The index is built once per Petri net and cached on it under "_successors",
+    so repeated metric calls on the same net share it.
+
+    Args:
+    - petri_net (dict): Petri net with a "flow_relation" list of (source, target) pairs.
+
+    Returns:
+    - dict: Transition name -> frozenset of successor transition names.
+    """
+    successors = petri_net.get("_successors")
+    if successors is None:
+        grouped = defaultdict(set)
+        for source, target in petri_net["flow_relation"]:
+            grouped[source].add(target)
+        successors = {source: frozenset(targets) for source, targets in grouped.items()}
+        petri_net["_successors"] = successors
+    return successors
+
+
+def get_marking_masks(petri_net):
+    """
+    Encode markings as integer bitsets over the Petri net's transitions.
+
+    Each transition gets one bit; a marking is the OR of the bits of its
+    enabled transitions. Cached under "_marking_masks".
+
+    Args:
+    - petri_net (dict): Petri net with "initial_marking" and "flow_relation".
+
+    Returns:
+    - tuple: (initial marking mask, dict of transition -> (bit, successor mask)).
+    """
+    marking_masks = petri_net.get("_marking_masks")
+    if marking_masks is None:
+        successors = get_successors(petri_net)
+        transitions = dict.fromkeys(chain(
+            petri_net["initial_marking"], chain.from_iterable(petri_net["flow_relation"])
+        ))
+        bits = {transition: 1 << i for i, transition in enumerate(transitions)}
+        initial_mask = 0
+        for transition in petri_net["initial_marking"]:
+            initial_mask |= bits[transition]
+        transition_masks = {}
+        for transition, bit in bits.items():
+            successor_mask = 0
+            for target in successors.get(transition, EMPTY_MARKING):
+                successor_mask |= bits[target]
+            transition_masks[transition] = (bit, successor_mask)
+        marking_masks = (initial_mask, transition_masks)
+        petri_net["_marking_masks"] = marking_masks
+    return marking_masks
+
+
+def replay_trace(trace, initial_mask, transition_masks):
+    """
+    Count how many events of a trace replay before the first non-enabled one.
+
+    Args:
+    - trace: List of task names.
+    - initial_mask (int): Bitset of the initial marking.
+    - transition_masks (dict): Transition -> (bit, successor mask) from get_marking_masks.
+
+    Returns:
+    - int: Number of events replayed.
+    """
+    marking = initial_mask
+    replayed = 0
+    for event in trace:
+        bit, successor_mask = transition_masks.get(event, (0, 0))
+        if not marking & bit:
+            break
+        replayed += 1
+        marking = successor_mask
+    return replayed
+
+
+def map_chunks(function, items, n_jobs):
+    """
+    Apply a function to chunks of items, in worker processes when n_jobs > 1.
+
+    Args:
+    - function: Picklable callable taking a list of items.
+    - items (list): Items to split into one chunk per job.
+    - n_jobs (int): Number of processes; None or <= 0 uses all CPUs.
+
+    Returns:
+    - list: One result per chunk.
+    """
+    if n_jobs is None or n_jobs <= 0:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs == 1 or len(items) < 2:
+        return [function(items)]
+
+    chunk_size = -(-len(items) // n_jobs)
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+        return list(executor.map(function, chunks))
+
+
+def fitness_chunk(traces, initial_mask, transition_masks):
+    """
+    Sum the per-trace fitness of a chunk of traces.
+
+    Returns:
+    - tuple: (sum of trace fitness, number of non-empty traces).
+    """
+    trace_fitness = [
+        replay_trace(trace, initial_mask, transition_masks) / len(trace)
+        for trace in traces
+        if trace  # Skip empty traces
+    ]
+    return sum(trace_fitness), len(trace_fitness)
+
+
+def calculate_fitness(petri_net, traces, n_jobs=1):
     """
     Calculate the fitness of the Petri net with respect to the given traces.
+
+    Traces are replayed in n_jobs worker processes when n_jobs > 1.
     """
-    total_fitness = 0
-    valid_traces = 0
-    for trace in traces:
-        if not trace:  # Skip empty traces
-            continue
-        marking = set(petri_net["initial_marking"])  # Use set for marking
-        trace_fitness = 0
-        for event in trace:
-            if event in marking:
-                trace_fitness += 1
-                marking = set([place[1] for place in petri_net["flow_relation"] if place[0] == event])
-            else:
-                break
-        total_fitness += trace_fitness / len(trace)
-        valid_traces += 1
+    initial_mask, transition_masks = get_marking_masks(petri_net)
+    replay_chunk = partial(
+        fitness_chunk, initial_mask=initial_mask, transition_masks=transition_masks
+    )
+    results = map_chunks(replay_chunk, list(traces), n_jobs)
+    total_fitness = sum(fitness for fitness, _ in results)
+    valid_traces = sum(count for _, count in results)
     return total_fitness / valid_traces if valid_traces > 0 else 0
 
 
-def calculate_precision(petri_net, traces):
+def observed_pairs_chunk(traces):
+    """
+    Collect the distinct directly-follows pairs of a chunk of traces.
+    """
+    return set(chain.from_iterable(zip(trace, trace[1:]) for trace in traces))
+
+
+def calculate_precision(petri_net, traces, n_jobs=1):
     """
     Calculate the precision of the Petri net with respect to the given traces.
+
+    Observed pairs are collected in n_jobs worker processes when n_jobs > 1.
     """
-    allowed_behavior = defaultdict(set)
-    observed_behavior = defaultdict(set)
+    # The allowed behavior is exactly the cached successor index of the net
+    allowed_behavior = get_successors(petri_net)
     
-    for trace in traces:
-        for i in range(len(trace) - 1):
-            observed_behavior[trace[i]].add(trace[i + 1])
-    
-    for source, target in petri_net["flow_relation"]:
-        allowed_behavior[source].add(target)
+    # Distinct observed directly-follows pairs of the whole log, deduplicated
+    # per chunk in one set construction, then counted per source
+    observed_pairs = set().union(*map_chunks(observed_pairs_chunk, list(traces), n_jobs))
+    observed_counts = Counter(map(itemgetter(0), observed_pairs))
     
     precision_sum = 0
-    for event in allowed_behavior:
-        if event in observed_behavior:
-            precision_sum += len(observed_behavior[event]) / len(allowed_behavior[event])
+    for event, allowed in allowed_behavior.items():
+        observed = observed_counts.get(event)
+        if observed:
+            precision_sum += observed / len(allowed)
     
     return precision_sum / len(allowed_behavior) if allowed_behavior else 0
 
@@ -111,17 +292,28 @@ def generate_test_traces(petri_net, num_traces, max_length=10, min_length=1):
     """
     Generate test traces based on the Petri net.
     """
+    successors = get_successors(petri_net)
+    initial_marking = frozenset(petri_net["initial_marking"])
+    transitions = petri_net["transitions"]
+    
+    # Enabled transitions per marking, in transition order; markings are
+    # shared frozensets, so each distinct one is filtered only once
+    candidates_cache = {}
+    
     test_traces = []
     for _ in range(num_traces):
         trace = []
-        marking = set(petri_net["initial_marking"])
+        marking = initial_marking
         for _ in range(max_length):
-            possible_events = [event for event in petri_net["transitions"] if event in marking]
+            possible_events = candidates_cache.get(marking)
+            if possible_events is None:
+                possible_events = tuple(event for event in transitions if event in marking)
+                candidates_cache[marking] = possible_events
             if not possible_events or (len(trace) >= min_length and random.random() < 0.1):  # 10% chance to end trace early, but ensure minimum length
                 break
             event = random.choice(possible_events)
             trace.append(event)
-            marking = set([place[1] for place in petri_net["flow_relation"] if place[0] == event])
+            marking = successors.get(event, EMPTY_MARKING)
         if trace:  # Only add non-empty traces
             test_traces.append(trace)
     return test_traces
@@ -129,11 +321,8 @@ def generate_test_traces(petri_net, num_traces, max_length=10, min_length=1):
 
 if __name__ == "__main__":
     try:
-        # Load the raw event log
-        raw_event_log = load_event_log("event_log.json")
-        
-        # Preprocess the event log to extract task names
-        event_log = preprocess_event_log(raw_event_log)
+        # Load the event log as traces of task names
+        event_log = load_task_traces("event_log.json")
         
         # Fetch the latest Petri net model
         petri_net = fetch_latest_petri_net()